@@ -5,14 +5,15 @@ FastAPI server with background trading execution
 """
 
 import os
+import secrets
 import sys
+import time
+from functools import wraps
 from pathlib import Path
 from datetime import datetime
-from threading import Thread
-import time
 
-from fastapi import FastAPI
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse, Response
 import uvicorn
 
 # Add src to path
@@ -22,53 +23,102 @@ from src.core.config import get_settings
 from src.modules.logger import bot_logger
 from trader import TradingBotBackground
 
-# Initialize FastAPI
-app = FastAPI(title="Trading Bot", version="1.0")
+# Initialize FastAPI - orjson serializes (datetimes included) in C,
+# several times faster than the stdlib json encoder
+app = FastAPI(title="Trading Bot", version="1.0", default_response_class=ORJSONResponse)
 
 # Global bot instance
 bot_instance = None
-bot_thread = None
+
+# Health/status payloads change at most once per trading cycle, but
+# uptime probes can hit them far more often - serve a cached body for
+# a short TTL to absorb bursts without re-serializing
+_RESPONSE_CACHE_TTL = 1.0
+_response_cache = {}
+
+
+def _ttl_cached(route: str):
+    """Cache a handler's rendered response body for _RESPONSE_CACHE_TTL seconds"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            now = time.monotonic()
+            cached = _response_cache.get(route)
+            if cached and now - cached[0] < _RESPONSE_CACHE_TTL:
+                return Response(
+                    content=cached[1],
+                    status_code=cached[2],
+                    media_type="application/json"
+                )
+            response = func(*args, **kwargs)
+            _response_cache[route] = (now, response.body, response.status_code)
+            return response
+        return wrapper
+    return decorator
 
 
 @app.get("/")
+@_ttl_cached("/")
 def health_check():
     """Health check endpoint"""
-    return JSONResponse({
+    return ORJSONResponse({
         "status": "running",
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": datetime.utcnow(),
         "bot_active": bot_instance.is_running if bot_instance else False
     })
 
 
 @app.get("/status")
+@_ttl_cached("/status")
 def get_status():
     """Get bot status"""
     if not bot_instance:
-        return JSONResponse({"error": "Bot not initialized"}, status_code=503)
-    
-    return JSONResponse({
+        return ORJSONResponse({"error": "Bot not initialized"}, status_code=503)
+
+    return ORJSONResponse({
         "is_running": bot_instance.is_running,
         "has_position": bot_instance.current_position is not None,
-        "last_check": bot_instance.last_check_time.isoformat() if bot_instance.last_check_time else None,
-        "uptime_seconds": (datetime.utcnow() - bot_instance.start_time).total_seconds() if bot_instance.start_time else 0
+        "last_check": bot_instance.last_check_time,
+        "uptime_seconds": bot_instance.uptime_seconds
     })
 
 
+@app.post("/emergency_stop")
+async def emergency_stop(request: Request):
+    """Signal an emergency stop - picked up at the next trading cycle
+
+    This liquidates any open position, so it is gated behind the
+    EMERGENCY_STOP_TOKEN shared secret; the endpoint is disabled when
+    no token is configured.
+    """
+    token = os.getenv("EMERGENCY_STOP_TOKEN")
+    if not token:
+        return ORJSONResponse({"error": "Emergency stop endpoint not configured"}, status_code=403)
+
+    provided = request.headers.get("X-Emergency-Token", "")
+    if not secrets.compare_digest(provided, token):
+        return ORJSONResponse({"error": "Unauthorized"}, status_code=401)
+
+    if not bot_instance:
+        return ORJSONResponse({"error": "Bot not initialized"}, status_code=503)
+
+    bot_instance.emergency_event.set()
+    bot_logger.warning("Emergency stop requested via API")
+    return ORJSONResponse({"status": "emergency stop requested"})
+
+
 @app.on_event("startup")
 async def startup_event():
-    """Start bot in background thread on server startup"""
-    global bot_instance, bot_thread
-    
+    """Start bot on the server's event loop on startup"""
+    global bot_instance
+
     bot_logger.info("FastAPI server starting - initializing bot")
-    
-    # Create bot instance
+
+    # Create bot instance and co-host its scheduler on this event loop
     bot_instance = TradingBotBackground()
-    
-    # Start bot in background thread
-    bot_thread = Thread(target=bot_instance.start, daemon=True)
-    bot_thread.start()
-    
-    bot_logger.info("Bot background thread started")
+    await bot_instance.start()
+
+    bot_logger.info("Bot scheduler started on event loop")
 
 
 @app.on_event("shutdown")
@@ -78,15 +128,23 @@ async def shutdown_event():
     
     if bot_instance:
         bot_logger.info("FastAPI server shutting down - stopping bot")
-        bot_instance.stop("Server shutdown")
+        await bot_instance.stop("Server shutdown")
+        # Give queued notifications (including the shutdown notice) a
+        # chance to go out before the loop closes
+        await bot_instance.join_notifications()
 
 
 if __name__ == "__main__":
     port = int(os.getenv("PORT", 8000))
-    uvicorn.run(
-        "main:app",
+    # Pass the app object instead of the "main:app" string so uvicorn
+    # doesn't re-import this module (and duplicate its global setup)
+    config = uvicorn.Config(
+        app,
         host="0.0.0.0",
         port=port,
         log_level="info",
-        access_log=False  # Reduce log noise
+        access_log=False,  # Reduce log noise
+        loop="uvloop",  # C event loop - faster scheduling
+        http="httptools"  # C HTTP parser instead of pure-Python h11
     )
+    uvicorn.Server(config).run()
@@ -3,10 +3,20 @@ Trading Bot Background Worker
 Executes trading logic periodically without blocking
 """
 
+import asyncio
+import itertools
+import math
 import time
 from datetime import datetime, timedelta
+from pathlib import Path
 from typing import Optional
-from apscheduler.schedulers.background import BackgroundScheduler
+
+import numpy as np
+import pandas as pd
+from apscheduler.executors.asyncio import AsyncIOExecutor
+from apscheduler.executors.pool import ThreadPoolExecutor
+from apscheduler.jobstores.memory import MemoryJobStore
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 
 from src.core.config import get_settings, reload_settings
@@ -20,13 +30,43 @@ from src.modules.daily_controller import DailyController
 from src.modules.logger import bot_logger
 from src.modules.telegram_notifier import telegram_notifier
 
+# Binance spot taker fee - only used to estimate the entry fee when the
+# fill didn't report an actual commission
+_TAKER_FEE_RATE = 0.001
+
+# Sentinel telling the notification worker to drain out and exit
+_NOTIFY_STOP = object()
+
+
+def _to_reason(reason: str) -> TradeReason:
+    """Resolve a reason string to TradeReason, defaulting to MANUAL_CLOSE"""
+    try:
+        return TradeReason(reason)
+    except ValueError:
+        return TradeReason.MANUAL_CLOSE
+
+
+def pnl_series(entry_price: float, quantity: float, prices: np.ndarray) -> np.ndarray:
+    """Vectorized gross P&L for a long position over an array of prices
+
+    Live trading only needs the scalar Position.update_pnl path, but
+    replaying klines (backtest/simulation) calls this once per run
+    instead of looping update_pnl over every bar.
+    """
+    return (np.asarray(prices, dtype=np.float64) - entry_price) * quantity
+
 
 class TradingBotBackground:
     """
-    Trading bot with APScheduler for periodic execution
+    Trading bot with APScheduler for periodic execution on the asyncio event loop
     Designed for Railway deployment with minimal CPU usage
     """
-    
+
+    # Per-process trade sequence - time_ns in the id keeps it unique
+    # across restarts, the counter within the same nanosecond
+    _trade_counter = itertools.count()
+
+
     def __init__(self):
         self.settings = get_settings()
         
@@ -42,22 +82,50 @@ class TradingBotBackground:
         # State
         self.is_running = False
         self.current_position: Optional[Position] = None
+        # Actual commission of the open position's entry fill
+        self._entry_fee: float = 0.0
         self.last_check_time: Optional[datetime] = None
         self.start_time: Optional[datetime] = None
-        
-        # Scheduler
-        self.scheduler = BackgroundScheduler(
-            timezone='UTC',
-            job_defaults={
-                'coalesce': True,  # Combine missed runs
-                'max_instances': 1,  # Only one instance at a time
-                'misfire_grace_time': 30  # Allow 30s delay
-            }
-        )
-    
-    def start(self):
-        """Start the trading bot with scheduled execution"""
+        # Monotonic start mark for uptime math - immune to wall-clock jumps
+        self._start_mono: Optional[float] = None
+
+        # Kline cache - historical candles are immutable, so after the
+        # initial full fetch only new candles are pulled each cycle
+        self._klines_cache: Optional[pd.DataFrame] = None
+
+        # Settings reload gate - only re-parse .env when its mtime changes
+        self._env_path = Path(__file__).parent / ".env"
+        self._env_mtime: Optional[float] = None
+
+        # Telegram delivery queue - notifications are drained by a
+        # background task so their HTTP latency never blocks trading
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._notify_queue: Optional[asyncio.Queue] = None
+        self._notify_task: Optional[asyncio.Task] = None
+
+        # Emergency stop signal - settable from the API without touching
+        # the settings file
+        self.emergency_event = asyncio.Event()
+
+        # Scheduler (created in start() so it binds to the running event loop)
+        self.scheduler: Optional[AsyncIOScheduler] = None
+
+    @property
+    def uptime_seconds(self) -> float:
+        """Seconds since start(), measured on the monotonic clock"""
+        if self._start_mono is None:
+            return 0.0
+        return time.monotonic() - self._start_mono
+
+    async def start(self):
+        """Start the trading bot with scheduled execution on the event loop"""
         self.start_time = datetime.utcnow()
+        self._start_mono = time.monotonic()
+
+        # Start the notification worker before anything can notify
+        self._loop = asyncio.get_running_loop()
+        self._notify_queue = asyncio.Queue()
+        self._notify_task = self._loop.create_task(self._notify_worker())
         
         bot_logger.log_startup(
             self.settings.mode.value,
@@ -65,19 +133,36 @@ class TradingBotBackground:
         )
         
         # Validate configuration
-        if not self._validate_startup():
+        if not await self._validate_startup():
             bot_logger.error("Startup validation failed")
             return
         
         # Send startup notification
-        telegram_notifier.notify_startup(self.settings.get_config_summary())
+        self._notify('notify_startup', self.settings.get_config_summary())
         
         # Initialize daily stats
-        balance = self.execution_engine.get_usdt_balance()
+        balance = await asyncio.to_thread(self.execution_engine.get_usdt_balance)
         if balance:
             self.daily_controller.get_or_create_daily_stats(balance.free)
-            telegram_notifier.notify_new_day(balance.free)
+            self._notify('notify_new_day', balance.free)
         
+        # Scheduler runs on the same event loop as the FastAPI server -
+        # no extra thread, no keepalive loop needed
+        self.scheduler = AsyncIOScheduler(
+            event_loop=asyncio.get_running_loop(),
+            timezone='UTC',
+            jobstores={'default': MemoryJobStore()},
+            executors={
+                'default': AsyncIOExecutor(),  # async trading cycle on the loop
+                'sync': ThreadPoolExecutor(max_workers=1)  # blocking cron jobs, one thread is plenty
+            },
+            job_defaults={
+                'coalesce': True,  # Combine missed runs
+                'max_instances': 1,  # Only one instance at a time
+                'misfire_grace_time': 30  # Allow 30s delay
+            }
+        )
+
         # Schedule trading cycle (every 60 seconds by default)
         interval = max(self.settings.refresh_interval, 60)  # Minimum 60s
         self.scheduler.add_job(
@@ -95,7 +180,8 @@ class TradingBotBackground:
             hour=23,
             minute=59,
             id='daily_report',
-            name='Daily Report'
+            name='Daily Report',
+            executor='sync'
         )
         
         # Schedule new day check (every hour)
@@ -103,51 +189,115 @@ class TradingBotBackground:
             self._check_new_day,
             trigger=IntervalTrigger(hours=1),
             id='check_new_day',
-            name='Check New Day'
+            name='Check New Day',
+            executor='sync'
         )
         
-        # Start scheduler
+        # Start scheduler (event loop keeps the process alive)
         self.scheduler.start()
         self.is_running = True
-        
+
         bot_logger.info(f"Bot started - trading cycle every {interval}s")
-        
-        # Keep thread alive
-        try:
-            while self.is_running:
-                time.sleep(10)
-        except (KeyboardInterrupt, SystemExit):
-            self.stop("Interrupted")
-    
-    def stop(self, reason: str = "Manual stop"):
+
+    async def stop(self, reason: str = "Manual stop"):
         """Stop the trading bot"""
         self.is_running = False
-        
+
         # Close any open position
         if self.current_position and self.current_position.status == PositionStatus.OPEN:
-            self._close_position(TradeReason.MANUAL_CLOSE)
-        
+            await self._close_position(TradeReason.MANUAL_CLOSE)
+
         # Shutdown scheduler
-        if self.scheduler.running:
+        if self.scheduler and self.scheduler.running:
             self.scheduler.shutdown(wait=False)
-        
+
         bot_logger.log_shutdown(reason)
-        telegram_notifier.notify_shutdown(reason)
+
+        # Hand the shutdown notice to the worker and let it drain what's
+        # queued off the loop before exiting on the sentinel - no
+        # blocking Telegram HTTP runs here, which matters when stop() is
+        # invoked from inside a trading cycle (emergency stop) while the
+        # server keeps serving
+        queue = self._notify_queue
+        self._notify_queue = None
+        if queue is not None:
+            queue.put_nowait(('notify_shutdown', (reason,)))
+            queue.put_nowait(_NOTIFY_STOP)
+        else:
+            await asyncio.to_thread(telegram_notifier.notify_shutdown, reason)
+
+    async def join_notifications(self, timeout: float = 5.0):
+        """Wait for the notification worker to finish draining after stop()"""
+        task = self._notify_task
+        if task is None:
+            return
+        self._notify_task = None
+        try:
+            await asyncio.wait_for(task, timeout)
+        except asyncio.TimeoutError:
+            bot_logger.warning("Notification queue not drained before shutdown timeout")
+            task.cancel()
+        except asyncio.CancelledError:
+            pass
+
+    def _notify(self, method: str, *args):
+        """Queue a notification for background delivery
+
+        Safe to call from the event loop or from sync-executor jobs.
+        Falls back to a direct (blocking) send if the worker isn't
+        running, e.g. during startup validation failures.
+        """
+        queue = self._notify_queue
+        if queue is None:
+            getattr(telegram_notifier, method)(*args)
+            return
+
+        try:
+            on_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            on_loop = False
+
+        if on_loop:
+            queue.put_nowait((method, args))
+        else:
+            # asyncio.Queue is not thread-safe - jobs on the 'sync'
+            # executor must hand the put over to the loop
+            self._loop.call_soon_threadsafe(queue.put_nowait, (method, args))
+
+    async def _notify_worker(self):
+        """Drain queued notifications off the trading cycle's critical path"""
+        # Snapshot the queue - stop() clears the attribute while we may
+        # still be draining
+        queue = self._notify_queue
+        while True:
+            item = await queue.get()
+            try:
+                if item is _NOTIFY_STOP:
+                    return
+                method, args = item
+                try:
+                    # notifier calls are blocking HTTP - keep them off the loop
+                    await asyncio.to_thread(getattr(telegram_notifier, method), *args)
+                except Exception as e:
+                    bot_logger.error(f"Failed to send notification {method}: {e}")
+            finally:
+                queue.task_done()
     
-    def _validate_startup(self) -> bool:
+    async def _validate_startup(self) -> bool:
         """Validate all startup requirements"""
         # Check credentials
         if not self.settings.validate_credentials():
             bot_logger.error("Invalid API credentials")
             return False
-        
-        # Test API connectivity
-        if not self.execution_engine.test_connectivity():
+
+        # Test API connectivity - blocking REST, keep it off the loop so
+        # health checks stay responsive while Binance answers
+        if not await asyncio.to_thread(self.execution_engine.test_connectivity):
             bot_logger.error("Failed to connect to Binance API")
             return False
-        
+
         # Check account balance
-        balance = self.execution_engine.get_usdt_balance()
+        balance = await asyncio.to_thread(self.execution_engine.get_usdt_balance)
         if balance is None or balance.free < self.settings.min_position_size_usdt:
             bot_logger.error(f"Insufficient balance: {balance}")
             return False
@@ -161,18 +311,42 @@ class TradingBotBackground:
         
         return True
     
-    def _trading_cycle(self):
+    def _maybe_reload_settings(self):
+        """Reload settings only if the .env file changed since last check"""
+        try:
+            mtime = self._env_path.stat().st_mtime
+        except OSError:
+            # No .env file - settings come from process env vars, which
+            # can't change while running
+            return
+
+        if mtime != self._env_mtime:
+            self.settings = reload_settings()
+            self._env_mtime = mtime
+
+    async def _trading_cycle(self):
         """Execute one trading cycle - called by scheduler"""
         try:
             self.last_check_time = datetime.utcnow()
             
-            # Reload settings to check for emergency stop
-            self.settings = reload_settings()
-            
+            # Emergency stop signalled via the API - a bool read, checked
+            # before anything else
+            if self.emergency_event.is_set():
+                bot_logger.warning("Emergency stop activated")
+                self._notify('notify_emergency_stop', "Emergency stop requested via API")
+                await self.stop("Emergency stop")
+                return
+
+            # Reload settings to check for emergency stop - gated on the
+            # .env mtime so the usual cycle costs one stat() instead of a
+            # full pydantic re-parse. Env-var-only deploys have no .env
+            # and can't change settings at runtime, so nothing to reload.
+            self._maybe_reload_settings()
+
             if self.settings.emergency_stop:
                 bot_logger.warning("Emergency stop activated")
-                telegram_notifier.notify_emergency_stop("Emergency stop flag set")
-                self.stop("Emergency stop")
+                self._notify('notify_emergency_stop', "Emergency stop flag set")
+                await self.stop("Emergency stop")
                 return
             
             # Check if trading is allowed
@@ -182,57 +356,75 @@ class TradingBotBackground:
                 bot_logger.debug(f"Trading not allowed: {reason}")
                 return
             
-            # Get current price
-            current_price = self.execution_engine.get_current_price()
+            # If we have an open position, manage it - this branch needs
+            # both price and balance, fetched concurrently
+            if self.current_position and self.current_position.status == PositionStatus.OPEN:
+                current_price, balance = await asyncio.gather(
+                    asyncio.to_thread(self.execution_engine.get_current_price),
+                    asyncio.to_thread(self.execution_engine.get_usdt_balance),
+                )
+
+                if current_price is None:
+                    bot_logger.warning("Failed to get current price")
+                    return
+
+                if balance is None:
+                    bot_logger.warning("Failed to get account balance")
+                    return
+
+                daily_stats = self.daily_controller.get_or_create_daily_stats(balance.free)
+                await self._manage_position(current_price, daily_stats, balance)
+                return
+
+            # No position: fetch price and klines concurrently and run the
+            # signal check first - the balance round-trip is deferred into
+            # _look_for_entry and skipped on the ~95% of no-signal cycles
+            current_price, df = await asyncio.gather(
+                asyncio.to_thread(self.execution_engine.get_current_price),
+                asyncio.to_thread(self._get_klines_incremental, 500),
+            )
+
             if current_price is None:
                 bot_logger.warning("Failed to get current price")
                 return
-            
-            # Get account balance
-            balance = self.execution_engine.get_usdt_balance()
-            if balance is None:
-                bot_logger.warning("Failed to get account balance")
-                return
-            
-            # Update daily stats
-            daily_stats = self.daily_controller.get_or_create_daily_stats(balance.free)
-            
-            # If we have an open position, manage it
-            if self.current_position and self.current_position.status == PositionStatus.OPEN:
-                self._manage_position(current_price, daily_stats)
-                return
-            
+
             # Look for new trade opportunity
-            self._look_for_entry(current_price, balance, daily_stats)
-            
+            await self._look_for_entry(current_price, df)
+
         except Exception as e:
             bot_logger.exception(f"Error in trading cycle: {e}")
-            telegram_notifier.notify_error("Trading Cycle Error", str(e))
+            self._notify('notify_error', "Trading Cycle Error", str(e))
     
-    def _look_for_entry(self, current_price: float, balance: AccountBalance, daily_stats):
+    async def _look_for_entry(self, current_price: float, df: Optional[pd.DataFrame]):
         """Look for trade entry opportunity"""
-        # Get historical data
-        df = self.execution_engine.get_klines(limit=500)
         if df is None or df.empty:
             bot_logger.warning("Failed to get historical data")
             return
-        
+
         # Analyze market
         signal = self.strategy_engine.analyze(df, current_price)
-        
-        # Log signal analysis (reduced verbosity)
-        if signal.is_valid:
-            bot_logger.log_signal_analysis({
-                "current_price": current_price,
-                "signal_type": signal.signal_type.value,
-                "confluence_score": signal.confluence.percentage,
-                "is_valid": signal.is_valid,
-            })
-        
-        # If signal is not valid, return silently
+
+        # If signal is not valid, return silently - the common path pays
+        # for no log-dict construction or attribute chains
         if not signal.is_valid:
             return
-        
+
+        # Log signal analysis (reduced verbosity)
+        bot_logger.log_signal_analysis({
+            "current_price": current_price,
+            "signal_type": signal.signal_type.value,
+            "confluence_score": signal.confluence.percentage,
+            "is_valid": True,
+        })
+
+        # Only a valid signal is worth the balance round-trip
+        balance = await asyncio.to_thread(self.execution_engine.get_usdt_balance)
+        if balance is None:
+            bot_logger.warning("Failed to get account balance")
+            return
+
+        daily_stats = self.daily_controller.get_or_create_daily_stats(balance.free)
+
         # Assess risk
         risk_assessment = self.risk_manager.assess_trade(
             signal, balance, daily_stats, self.current_position
@@ -246,24 +438,65 @@ class TradingBotBackground:
             return
         
         # Execute entry
-        self._execute_entry(signal, risk_assessment)
-    
-    def _execute_entry(self, signal, risk_assessment):
+        await self._execute_entry(signal, risk_assessment)
+
+    def _get_klines_incremental(self, limit: int = 500) -> Optional[pd.DataFrame]:
+        """Get klines, fetching only candles newer than the cached ones
+
+        The 499 historical candles in a 500-bar window never change, so
+        after the initial full fetch each cycle only transfers the still
+        forming candle (and any closed since), cutting payload and JSON
+        parsing cost by ~500x in the steady state.
+        """
+        cache = self._klines_cache
+        if cache is None or len(cache) < limit:
+            cache = self.execution_engine.get_klines(limit=limit)
+            self._klines_cache = cache
+            return cache
+
+        # Refetch from the last cached open_time so the (possibly still
+        # forming) last candle gets refreshed along with any new ones
+        last_open_time = int(cache.iloc[-1]["open_time"])
+        new_rows = self.execution_engine.get_klines(
+            limit=limit, startTime=last_open_time
+        )
+
+        if new_rows is None or new_rows.empty or int(new_rows.iloc[0]["open_time"]) != last_open_time:
+            # Gap or unexpected response - invalidate and refetch in full
+            self._klines_cache = self.execution_engine.get_klines(limit=limit)
+            return self._klines_cache
+
+        cache = pd.concat([cache.iloc[:-1], new_rows], ignore_index=True)
+        self._klines_cache = cache.iloc[-limit:].reset_index(drop=True)
+        return self._klines_cache
+
+    async def _execute_entry(self, signal, risk_assessment):
         """Execute trade entry"""
         # Send notification about signal
-        telegram_notifier.notify_signal_analysis(signal)
-        
-        # Place market order
-        success, order = self.execution_engine.place_market_order(
+        self._notify('notify_signal_analysis', signal)
+
+        # Place market order - blocking REST, keep it off the loop
+        success, order = await asyncio.to_thread(
+            self.execution_engine.place_market_order,
             OrderSide.BUY,
             risk_assessment.position_size_btc
         )
         
         if not success or order is None:
             bot_logger.error("Failed to place entry order")
-            telegram_notifier.notify_error("Order Error", "Failed to place entry order")
+            self._notify('notify_error', "Order Error", "Failed to place entry order")
             return
         
+        # Record the actual entry commission from the fill, falling back
+        # to the taker-rate estimate if the exchange didn't report one.
+        # Binance charges BUY commissions in the base asset (BTC) while
+        # all bookkeeping here is in USDT, so convert at the fill price;
+        # SELL commissions are already quote-denominated.
+        if order.commission:
+            self._entry_fee = order.commission * order.executed_price
+        else:
+            self._entry_fee = order.executed_price * order.executed_qty * _TAKER_FEE_RATE
+
         # Create position
         self.current_position = Position(
             symbol=self.settings.symbol,
@@ -286,43 +519,48 @@ class TradingBotBackground:
             "take_profit": risk_assessment.take_profit_price,
         })
         
-        telegram_notifier.notify_trade_entry(self.current_position, signal)
+        self._notify('notify_trade_entry', self.current_position, signal)
     
-    def _manage_position(self, current_price: float, daily_stats):
+    async def _manage_position(self, current_price: float, daily_stats, balance: Optional[AccountBalance] = None):
         """Manage open position"""
         if self.current_position is None:
             return
-        
-        # Update position P&L
+
+        # Update position P&L - guard against a bad ticker read poisoning
+        # the position's stored P&L and the SL/TP checks below
+        if not math.isfinite(current_price) or current_price <= 0:
+            bot_logger.warning(f"Ignoring invalid price {current_price} for P&L update")
+            return
         self.current_position.update_pnl(current_price)
-        
+
         # Check if should close
         should_close, reason = self.risk_manager.should_close_position(
             self.current_position, current_price, daily_stats
         )
-        
+
         if should_close:
-            self._close_position(TradeReason(reason) if reason in [e.value for e in TradeReason] else TradeReason.MANUAL_CLOSE)
-    
-    def _close_position(self, reason: TradeReason):
+            await self._close_position(_to_reason(reason), balance_before=balance)
+
+    async def _close_position(self, reason: TradeReason, balance_before: Optional[AccountBalance] = None):
         """Close the current position"""
         if self.current_position is None or self.current_position.status != PositionStatus.OPEN:
             return
-        
-        # Place sell order
-        success, order = self.execution_engine.place_market_order(
+
+        # Place sell order - blocking REST, keep it off the loop
+        success, order = await asyncio.to_thread(
+            self.execution_engine.place_market_order,
             OrderSide.SELL,
             self.current_position.quantity
         )
         
         if not success or order is None:
             bot_logger.error("Failed to place exit order")
-            telegram_notifier.notify_error("Order Error", "Failed to place exit order")
+            self._notify('notify_error', "Order Error", "Failed to place exit order")
             return
         
         # Create trade record
         trade = Trade(
-            trade_id=f"TRADE_{int(datetime.utcnow().timestamp())}",
+            trade_id=f"TRADE_{next(self._trade_counter)}_{time.time_ns()}",
             symbol=self.settings.symbol,
             side=OrderSide.BUY,
             entry_price=self.current_position.entry_price,
@@ -333,10 +571,10 @@ class TradingBotBackground:
             exit_time=datetime.utcnow(),
         )
         
-        # Calculate P&L
-        entry_fee = self.current_position.entry_price * self.current_position.quantity * 0.001
-        exit_fee = order.commission
-        trade.commission = entry_fee + exit_fee
+        # Calculate P&L - entry fee was captured from the entry fill, so
+        # this uses the real commission instead of a rate estimate
+        entry_fee = self._entry_fee or (self.current_position.entry_price * self.current_position.quantity * _TAKER_FEE_RATE)
+        trade.commission = entry_fee + order.commission
         trade.calculate_pnl()
         
         bot_logger.log_trade_exit({
@@ -346,26 +584,34 @@ class TradingBotBackground:
             "exit_reason": reason.value,
         })
         
-        telegram_notifier.notify_trade_exit(trade)
-        
-        # Update daily stats
-        balance = self.execution_engine.get_usdt_balance()
-        if balance:
-            daily_stats = self.daily_controller.update_after_trade(trade, balance.free)
+        self._notify('notify_trade_exit', trade)
+
+        # Update daily stats - derive the post-trade balance from the
+        # cycle's snapshot plus the sale proceeds instead of spending
+        # another REST round-trip on the exit critical path
+        if balance_before is not None:
+            balance_free = balance_before.free + (order.executed_price * order.executed_qty) - order.commission
+        else:
+            balance = await asyncio.to_thread(self.execution_engine.get_usdt_balance)
+            balance_free = balance.free if balance else None
+
+        if balance_free is not None:
+            daily_stats = self.daily_controller.update_after_trade(trade, balance_free)
             
             # Check if daily target reached
             if daily_stats.target_reached:
                 bot_logger.log_daily_target_reached(daily_stats.to_dict())
-                telegram_notifier.notify_daily_target_reached(daily_stats)
+                self._notify('notify_daily_target_reached', daily_stats)
             
             # Check if max loss reached
             if daily_stats.daily_pnl_percent <= -self.settings.max_daily_loss:
-                telegram_notifier.notify_max_loss_reached(daily_stats)
+                self._notify('notify_max_loss_reached', daily_stats)
         
         # Clear position
         self.current_position.status = PositionStatus.CLOSED
         self.current_position.closed_at = datetime.utcnow()
         self.current_position = None
+        self._entry_fee = 0.0
     
     def _check_new_day(self):
         """Check if it's a new day and reset if needed"""
@@ -375,10 +621,10 @@ class TradingBotBackground:
             
             # If stats were just created (new day), send notification
             if stats.total_trades == 0 and not stats.target_reached:
-                telegram_notifier.notify_new_day(balance.free)
+                self._notify('notify_new_day', balance.free)
     
     def _send_daily_report(self):
         """Send daily report"""
         report = self.daily_controller.get_daily_report()
         bot_logger.log_daily_report(report)
-        telegram_notifier.notify_daily_report(report)
+        self._notify('notify_daily_report', report)